@@ -1,70 +1,137 @@
-import re
 from agents.base_agent import BaseAgent
+from collections import ChainMap
 from pathlib import Path
-import json
+import functools
+import mmap
+import os
+import tempfile
+from utils.fs import ensure_dir
 from utils.llm_interface import LLMService
 
+# LLMService instances shared across agents with identical effective configs,
+# so they reuse one client (and its TCP/TLS connection pool) instead of each
+# paying for a fresh handshake on their first call
+_llm_services = {}
+
+
+def _llm_service_for(config):
+    key = tuple(sorted((k, repr(v)) for k, v in config.items()))
+    service = _llm_services.get(key)
+    if service is None:
+        service = _llm_services[key] = LLMService(config)
+    return service
+
+
+# Input files at or above this size are memory-mapped instead of read; below
+# it a plain single read wins because the mmap setup syscalls dominate
+_MMAP_THRESHOLD = 64 * 1024
+
+
+def _read_input_file(path):
+    path = Path(path)
+    if path.stat().st_size < _MMAP_THRESHOLD:
+        return path.read_bytes().decode().strip()
+    # Large inputs: decode straight out of the mapping, skipping the extra
+    # userspace copy a buffered read would make
+    with open(path, "rb") as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            return str(memoryview(mm), "utf-8").strip()
+
+
+class _SafeContext(ChainMap):
+    # O(1) view over the underlying context mapping (no copy). Unknown
+    # placeholders are re-emitted as "{key}" so a single format_map pass
+    # always succeeds and substitutions already made are preserved.
+    def __missing__(self, key):
+        return "{" + key + "}"
+
+
+@functools.lru_cache(maxsize=256)
+def _read_template(path_str, mtime_ns):
+    # Cache raw prompt template text across agent invocations so N input
+    # files through M agents cost M disk reads instead of N*M. mtime_ns is
+    # part of the key purely so an edited template invalidates its entry.
+    return Path(path_str).read_text()
+
+
 class Agent(BaseAgent):
-    def __init__(self, name, config):
+    def __init__(self, name, config, llm=None):
         # Initialize the base class (BaseAgent) with the agent's name and configuration
         super().__init__(name, config)
         # Log the initialization of the agent
         self.logger.info(f"Initializing Agent: {name}")
 
-        # Muki: Commenting this out as no need to load configs again here.
-        # Done in the orchestrator
-        # # Load the model configuration specific to this agent
-        # self.model_config = self.load_model_config(name)
-
-        # Initialize the LLM (Large Language Model) service with the loaded model configuration
-        self.llm = LLMService(self.config)
-
-# Muki: Loaded from Orchestrator. This is not needed
-    # def load_model_config(self, agent_name):
-    #     # Log the action of loading the model configuration for the agent
-    #     self.logger.info(f"Loading model config for {agent_name}")
-    #     # Load the default model configuration from a JSON file
-    #     with open("config/default_model_config.json") as f:
-    #         default_config = json.load(f)
-    #     # Load agent-specific configuration overrides from a JSON file
-    #     with open("config/agent_config.json") as f:
-    #         overrides = json.load(f).get(agent_name, {})
-    #     # Merge the default configuration with the agent-specific overrides
-    #     # Agent-specific overrides take precedence over default values
-    #     return {**default_config, **overrides}
+        # Warm the prompt-template cache at construction so this agent's first
+        # run doesn't pay the disk reads; missing templates are fine, run()
+        # falls back to its defaults for them
+        for template_file in ("system.txt", "user_template.txt"):
+            template_path = f"prompts/{name}/{template_file}"
+            try:
+                _read_template(template_path, os.stat(template_path).st_mtime_ns)
+            except FileNotFoundError:
+                pass
+
+        # Use the caller-supplied LLM service if one was passed in; otherwise
+        # look one up for this agent's merged configuration. Agents with the
+        # same effective config share a single service and connection pool.
+        self.llm = llm if llm is not None else _llm_service_for(self.config)
+
+        # Bind the output-file-name strategy once at construction; the config
+        # never changes after init, so the per-call path is a single function
+        # call with no dict membership checks
+        if "output_file" in config:
+            output_file = config["output_file"]
+            self._output_file_name_fn = lambda input_path: output_file
+        elif "output_file_suffix" in config:
+            suffix = config["output_file_suffix"]
+            # Memoized per input path: repeated queries for the same input
+            # across the flow resolve without rebuilding the Path or stem
+            self._output_file_name_fn = functools.lru_cache(maxsize=1024)(
+                lambda input_path: f"{Path(input_path).stem}{suffix}"
+            )
+        else:
+            default_name = f"{name}.txt"
+            self._output_file_name_fn = lambda input_path: default_name
 
     def load_user_prompt_template(self, template_path, context_vars):
         # Log the path of the user prompt template being loaded
         self.logger.info(f"Loading user prompt template: {template_path}")
-        # Check if the template file exists
-        if not Path(template_path).exists():
+        # Read the contents of the template file directly (EAFP): a single
+        # open saves the extra stat syscall of an exists() check and avoids
+        # building the Path twice. The read itself is memoized by path+mtime
+        # so repeat invocations hit the in-memory cache.
+        try:
+            template = _read_template(str(template_path), os.stat(template_path).st_mtime_ns)
+        except FileNotFoundError:
             # If the file does not exist, log a warning and return an empty string
             self.logger.warning(f"User prompt template not found: {template_path}")
             return ""
-        # Read the contents of the template file
-        template = Path(template_path).read_text()
-        try:
-            # Attempt to format the template with the provided context variables
-            # Replace placeholders in the template (e.g., {variable_name}) with actual values from context_vars
-            return template.format(**context_vars)
-        except KeyError as e:
-            # If a placeholder in the template is missing from context_vars, log an error
-            self.logger.error(f"Missing placeholder key in user prompt template {template_path}: {e}")
-            # Return the unformatted template as a fallback
-            return template
+        # Format the template in one pass, replacing placeholders in the
+        # template (e.g., {variable_name}) with actual values from context_vars.
+        # Placeholders with no matching context variable are left as-is instead
+        # of raising KeyError and discarding all the substitutions already made.
+        return template.format_map(_SafeContext(context_vars))
 
     def extract_code_block(self, text):
         # Log the action of extracting a code block from the text
         self.logger.info("Extracting code block between triple backticks")
-        # Use a regular expression to find content enclosed in triple backticks (```)
-        # The pattern matches ``` optionally followed by a language identifier (e.g., ```python),
-        # then captures any characters (.*?) until the next triple backticks.
-        match = re.search(r"```(?:\w+)?\n(.*?)```", text, re.DOTALL)
-        if not match:
-            # If no match is found, raise a ValueError
+        # Locate the fenced block with str.find (a linear C-level scan) instead
+        # of a backtracking regex, which is slow on multi-KB LLM responses.
+        # The opening fence is ``` optionally followed by a language identifier
+        # (e.g., ```python) up to the end of that line.
+        start = text.find("```")
+        if start < 0:
+            # If no opening fence is found, raise a ValueError
+            raise ValueError("Expected code block not found between triple backticks.")
+        # Skip past the rest of the opening fence line (language identifier)
+        newline = text.find("\n", start + 3)
+        # Find the closing fence after the opening line
+        end = text.find("```", newline + 1) if newline >= 0 else -1
+        if newline < 0 or end < 0:
+            # If the block is not properly closed, raise a ValueError
             raise ValueError("Expected code block not found between triple backticks.")
         # Extract the content inside the backticks and strip any leading/trailing whitespace
-        code_content = match.group(1).strip()
+        code_content = text[newline + 1:end].strip()
         # Return the extracted content, removing the triple backticks
         return f"{code_content}"
 
@@ -74,36 +141,31 @@ class Agent(BaseAgent):
         If `output_file` is specified in the config, use it.
         If `output_file_suffix` is specified, append it to the input file name.
         Otherwise, default to `{agent_name}.txt`.
+        The branch on the configuration is resolved once in `__init__`.
         """
-        # Check for explicit output file name in the agent's configuration
-        if "output_file" in self.config:
-            return self.config["output_file"]
-
-        # Check for a suffix to append to the input file name
-        if "output_file_suffix" in self.config:
-            original_file_name = Path(input_path).stem
-            return f"{original_file_name}{self.config['output_file_suffix']}"
-
-        # Default to `{agent_name}.txt`
-        return f"{self.name}.txt"
+        return self._output_file_name_fn(input_path)
 
     def run(self, input_file, output_dir, previous_outputs=None):
         self.logger.info(f"Running agent {self.name}...")
 
         try:
             # --- Load Prompts ---
-            system_prompt_path = Path(f"prompts/{self.name}/system.txt")
-            system_prompt = system_prompt_path.read_text() if system_prompt_path.exists() else "You are a helpful assistant."
+            system_prompt_path = f"prompts/{self.name}/system.txt"
+            try:
+                system_prompt = _read_template(system_prompt_path, os.stat(system_prompt_path).st_mtime_ns)
+            except FileNotFoundError:
+                system_prompt = "You are a helpful assistant."
 
             user_template_path = Path(f"prompts/{self.name}/user_template.txt")
-            context_vars = previous_outputs.copy() if previous_outputs else {}
+            # Chain a fresh dict in front of previous_outputs instead of
+            # copying it: O(1) per invocation, and new keys land in the front
+            # map without touching the shared outputs
+            context_vars = ChainMap({}, previous_outputs) if previous_outputs else {}
 
             # If no previous outputs and input file exists, read its content
             if not previous_outputs and input_file and Path(input_file).exists():
                 self.logger.info(f"Reading initial input file: {input_file}")
-                with open(input_file, 'r') as f:
-                    input_content = f.read().strip()
-                context_vars['input_content'] = input_content
+                context_vars['input_content'] = _read_input_file(input_file)
 
             # Load and format the user prompt using the template and context_vars
             user_prompt = self.load_user_prompt_template(user_template_path, context_vars)
@@ -116,7 +178,7 @@ class Agent(BaseAgent):
                         "role": "assistant",
                         "content": f"[Context from {agent_name_prev}]:\n{output_prev.strip()}"
                     })
-            print(f"User Prompt: \n {user_prompt}")
+            self.logger.debug("User prompt:\n%s", user_prompt)
 
             messages.append({"role": "user", "content": user_prompt})
 
@@ -125,7 +187,7 @@ class Agent(BaseAgent):
             response = self.llm.chat(messages)
             content = response.choices[0].message.content
 
-            print(f"Response: \n {content}")
+            self.logger.debug("Response:\n%s", content)
 
             # --- Process and Save Output ---
             output = self.extract_code_block(content)
@@ -134,13 +196,29 @@ class Agent(BaseAgent):
             output_file_name = self.get_output_file_name(input_file)
             output_path = Path(output_dir) / output_file_name
 
-            # Ensure the parent directory exists
-            output_path.parent.mkdir(parents=True, exist_ok=True)
+            # Ensure the parent directory exists (skipped once already created)
+            ensure_dir(output_path.parent)
 
-            # Write the extracted output to the specified file
+            # Write the extracted output to the specified file. Write to a
+            # unique temp file in the same directory and atomically swap it
+            # into place: a crash can never leave a truncated output behind,
+            # and concurrent writers of the same output (e.g. a join agent
+            # reached from two fan-out branches) can never clobber each
+            # other's temp file.
             self.logger.info(f"Writing output for agent {self.name} to {output_path}")
-            with open(output_path, 'w') as f:
-                f.write(output)
+            fd, tmp_path = tempfile.mkstemp(dir=output_path.parent, suffix=".tmp")
+            try:
+                with os.fdopen(fd, 'w') as f:
+                    f.write(output)
+                os.replace(tmp_path, output_path)
+            except OSError:
+                os.unlink(tmp_path)
+                raise
+
+            # Return the output and its path so the orchestrator can hand both
+            # to downstream agents without re-reading the file just written or
+            # recomputing the output file name
+            return output, output_path
 
         except Exception as e:
             # Log and raise an error if the agent fails
@@ -1,6 +1,14 @@
 import requests
 from agents.agent import Agent
 
+# Prefer orjson for parsing service responses (same fallback pattern as the
+# config loader); requests' own .json() goes through stdlib json
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
 class AgentCallExternalService(Agent):
     def run(self, input_path, output_folder, previous_outputs=None):
         self.logger.info(f"[{self.name}] Calling external service before LLM execution")
@@ -9,7 +17,7 @@ class AgentCallExternalService(Agent):
         try:
             response = requests.get("https://jsonplaceholder.typicode.com/todos/1")
             response.raise_for_status()
-            external_data = response.json()
+            external_data = orjson.loads(response.content) if orjson is not None else response.json()
         except Exception as e:
             self.logger.error(f"[{self.name}] Failed to call external service: {e}")
             raise RuntimeError(f"External API call failed: {str(e)}")
@@ -20,4 +28,4 @@ class AgentCallExternalService(Agent):
         previous_outputs["external_service"] = f"Fetched Todo: {external_data['title']}"
 
         # Step 3: Call parent Agent run with extended context
-        super().run(input_path, output_folder, previous_outputs)
+        return super().run(input_path, output_folder, previous_outputs)
@@ -1,157 +1,220 @@
-import json
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from utils.config_loader import load_json_config
+from utils.fs import ensure_dir
 from utils.logger import get_logger
 import os
 
+def _validate_flow(children):
+    """
+    Validate the agent flow once at startup: every referenced downstream
+    agent must be defined, and the graph must be acyclic (Kahn's algorithm).
+    Returns the agent names in topological order; raises ValueError on a bad
+    flow. Without this check a cycle in flow.json would spin the flow walk
+    forever at runtime instead of failing fast.
+    """
+    indegree = {agent_name: 0 for agent_name in children}
+    for agent_name, next_agents in children.items():
+        for next_agent in next_agents:
+            if next_agent not in indegree:
+                raise ValueError(f"Flow references undefined agent: {next_agent}")
+            indegree[next_agent] += 1
+
+    ready = deque(agent_name for agent_name, degree in indegree.items() if degree == 0)
+    topo_order = []
+    while ready:
+        agent_name = ready.popleft()
+        topo_order.append(agent_name)
+        for next_agent in children[agent_name]:
+            indegree[next_agent] -= 1
+            if indegree[next_agent] == 0:
+                ready.append(next_agent)
+
+    if len(topo_order) != len(children):
+        cyclic = sorted(agent_name for agent_name, degree in indegree.items() if degree > 0)
+        raise ValueError(f"Flow contains a cycle involving: {', '.join(cyclic)}")
+    return topo_order
+
+
 def run_orchestration(repo_path=None, output_base_path=None):
     logger = get_logger("Orchestrator")
     logger.info("Starting orchestration run")
 
-    # Load the agent execution flow from config
-    logger.info("Loading config/flow.json")
-    with open("config/flow.json") as f:
-        flow = json.load(f)
-
-    # Load default configuration for agents and system
-    logger.info("Loading config/default_config.json")
-    with open("config/default_config.json") as f:
-        default_config = json.load(f)
-
-    # Load agent-specific configuration overrides
-    logger.info("Loading config/agent_config.json")
-    with open("config/agent_config.json") as f:
-        agent_configs = json.load(f)
+    # Load the agent execution flow, the default configuration, and the
+    # agent-specific overrides. The three reads are submitted together so
+    # cold-cache disk latency overlaps instead of serializing; warm loads are
+    # answered from the config caches either way.
+    logger.info("Loading config/flow.json, config/default_config.json, config/agent_config.json")
+    with ThreadPoolExecutor(max_workers=3) as config_executor:
+        flow_future = config_executor.submit(load_json_config, "config/flow.json")
+        default_config_future = config_executor.submit(load_json_config, "config/default_config.json")
+        agent_configs_future = config_executor.submit(load_json_config, "config/agent_config.json")
+        flow = flow_future.result()
+        default_config = default_config_future.result()
+        agent_configs = agent_configs_future.result()
 
     # Import the Agent class (imported here to avoid circular imports or unnecessary imports if not running orchestration)
     logger.info("Importing Agent class")
     from agents.agent import Agent
 
+    # The default agent config is shared by every agent; merged configs are
+    # interned so agents with identical overrides (or none) share one dict
+    # instead of each holding its own copy for the process lifetime
+    default_agent_config = default_config.get("default_agent_config", {})
+    merged_config_cache = {}
+
     agents = {}
     # Initialize each agent defined in the flow
     for agent_name in flow:
         logger.info(f"Initializing agent: {agent_name}")
 
         # Directory containing prompt templates for this agent
-        prompt_path = f"prompts/{agent_name}/"  
+        prompt_path = f"prompts/{agent_name}/"
 
         # Merge default agent config with agent-specific config
-        merged_config = {**default_config.get("default_agent_config", {}), **agent_configs.get(agent_name, {})}
+        overrides = agent_configs.get(agent_name, {})
+        cache_key = tuple(sorted((k, repr(v)) for k, v in overrides.items()))
+        merged_config = merged_config_cache.get(cache_key)
+        if merged_config is None:
+            merged_config = merged_config_cache[cache_key] = {**default_agent_config, **overrides}
         agents[agent_name] = Agent(agent_name, config=merged_config)
 
-        print (f"Agent Name: {agent_name}\n==")
-        print (f"Agent Merged Config:\n {merged_config} \n\n")
+        logger.debug("Agent %s merged config: %s", agent_name, merged_config)
 
   
 
-    # Get the first agent in the flow as the starting point
-    initial_agent = list(flow.keys())[0]
-    print(f"Initial Agent: {initial_agent}")
+    # Get the first agent in the flow as the starting point (computed once,
+    # without materializing the full key list)
+    initial_agent = next(iter(flow))
+    logger.debug("Initial agent: %s", initial_agent)
+
+    # Precompute the downstream-agent tuples so execute() does a plain dict
+    # lookup per hop instead of repeated flow.get() calls, and validate the
+    # flow graph up front so bad configs fail fast instead of mid-run
+    downstream = {agent_name: tuple(next_agents) for agent_name, next_agents in flow.items()}
+    _validate_flow(downstream)
 
     # Determine the repository folder to use, from argument or config
     repo_folder_config = default_config.get("repository_folder", "repository")
     repo_folder = Path(repo_path) if repo_path else Path(repo_folder_config)
 
-    print(f"Repo folder : {repo_folder}")
+    logger.debug("Repo folder: %s", repo_folder)
 
     # Determine the output root directory, from argument or config
     output_root_config = default_config.get("output_folder", "output")
     output_root = Path(output_base_path) if output_base_path else Path(output_root_config)
 
-    print(f"Output Root folder : {output_root}")
+    logger.debug("Output root folder: %s", output_root)
 
     # Ensure the repository and output directories exist
-    repo_folder.mkdir(parents=True, exist_ok=True)
-    output_root.mkdir(parents=True, exist_ok=True)
-
-    # Iterate over each file in the repository folder (excluding __init__.py)
-    for file_path in repo_folder.glob("*.*"):
-        if file_path.name == "__init__.py":
-            continue  # Skip Python package files
+    ensure_dir(repo_folder)
+    ensure_dir(output_root)
 
+    # Run the full agent flow for a single input file. Each file has its own
+    # output subfolder and in-flight context, so files are fully independent
+    # of each other and can be processed concurrently.
+    def process_file(file_path):
         # File path name without extension
         input_file_name = file_path.stem
-        print(f"File Path name without extension: {input_file_name}")
+        logger.debug("File path name without extension: %s", input_file_name)
         logger.info(f"\n=== Processing input file: {file_path.name} ===")
 
-        
-
         # Create a subfolder in the output directory for this input file
-        output_subfolder = output_root / input_file_name
-        output_subfolder.mkdir(parents=True, exist_ok=True)
-
-        print(f"Output Sub folder : {output_subfolder}")
-
-        output_map = {}  # Stores outputs from each agent for this input file
-
-        # Recursive function to execute an agent and its downstream agents in the flow
-        def execute(agent_name, input_file, previous_agents=[]):
-            try:
-                logger.info(f"Executing {agent_name} on {input_file}...")
-                agent = agents[agent_name]
-
-                print(f"Agent Name : {agent}")
-
-                # Get the base output directory from the default_config.json
-                base_output_dir = default_config.get("output_folder", "output")
-                print(f"base_output_dir : {base_output_dir}")
-
-                # Create a directory for the agent within the base output directory
-                # agent_output_dir = Path(base_output_dir) / agent_name
-                # agent_output_dir.mkdir(parents=True, exist_ok=True)
-                # print(f"agent_output_dir : {agent_output_dir}")
-
-                # # Determine the output file name
-                # agent_config = agent_configs.get(agent_name, {})
-                # if "output_file" in agent_config:
-                #     # Use the explicitly specified output file name
-                #     output_file_name = agent_config["output_file"]
-                # elif "output_file_suffix" in agent_config:
-                #     # Append the suffix to the original input file name
-                #     original_file_name = Path(input_path).stem
-                #     output_file_name = f"{original_file_name}{agent_config['output_file_suffix']}.txt"
-                # else:
-                #     # Default to {agent_name}.txt
-                #     output_file_name = f"{agent_name}.txt"
-
-                # # Construct the full output path
-                # output_path = agent_output_dir / output_file_name
-
-                
-                # Gather outputs from previous agents for context
-                previous_outputs = {p: output_map[p] for p in previous_agents if p in output_map}
-
-                # Create a subfolder in the output directory for this input file
-                output_subfolder = output_root / input_file_name
-                output_subfolder.mkdir(parents=True, exist_ok=True)
-
-                print (f"output_subfolder: {output_subfolder}")
-
-    
-
-                # Run the agent on the input file, passing previous outputs as context
-                # agent.run(input_path, output_path, previous_outputs)
-                agent.run(input_file, output_subfolder, previous_outputs)
-
-                # Read and store the agent's output for use by downstream agents
-                # Agent determines the output file name
-                output_file = agent.get_output_file_name(input_file) 
-                output_path = output_subfolder / output_file
-                
-                # Read and store the agent's output for use by downstream agents
-                with open(output_path, 'r') as f:
-                    current_output = f.read()
-                output_map[agent_name] = current_output
-
-                # Recursively execute downstream agents as defined in the flow
-                for next_agent in flow.get(agent_name, []):
-                    execute(next_agent, output_path, previous_agents + [agent_name])
-            except Exception as e:
-                logger.error(f"Stopping flow: {agent_name} failed: {str(e)}")
-                return
+        output_subfolder = ensure_dir(output_root / input_file_name)
+
+        logger.debug("Output subfolder: %s", output_subfolder)
+
+        # Execute an agent and its downstream agents in the flow with an
+        # iterative depth-first worklist. This avoids per-call Python frame
+        # overhead and the shared-mutable-default hazard of the old recursive
+        # version. Stack entries carry the accumulated upstream outputs
+        # directly, extended once per node (O(depth) work over the flow
+        # instead of O(depth^2)). output_subfolder is bound once per file in
+        # the enclosing scope rather than recomputed per hop.
+        def execute(agent_name, input_file, previous_outputs=None):
+            stack = deque()
+            stack.append((agent_name, input_file, previous_outputs or {}))
+            while stack:
+                agent_name, input_file, previous_outputs = stack.pop()
+                try:
+                    logger.info(f"Executing {agent_name} on {input_file}...")
+                    agent = agents[agent_name]
+
+                    # Run the agent on the input file, passing previous outputs
+                    # as context. The agent returns its output string and the
+                    # path it wrote, so no read-back of the file is needed and
+                    # the output file name is computed exactly once per hop.
+                    current_output, output_path = agent.run(input_file, output_subfolder, previous_outputs)
+                except Exception as e:
+                    # Skip this agent's subtree but keep processing its siblings
+                    logger.error(f"Stopping flow: {agent_name} failed: {str(e)}")
+                    continue
+
+                # Queue downstream agents as defined in the flow. Sibling
+                # subtrees are independent of each other, so a fan-out runs
+                # them concurrently and the subtree latency drops from the sum
+                # of the branches to the slowest branch; a single child stays
+                # on the local stack with no thread overhead.
+                next_agents = downstream.get(agent_name, ())
+                if not next_agents:
+                    continue
+                if len(next_agents) > 1:
+                    # Branching: snapshot the extended context per child so a
+                    # child that adds keys cannot leak them to its siblings
+                    with ThreadPoolExecutor(max_workers=len(next_agents)) as branch_executor:
+                        branches = [
+                            branch_executor.submit(
+                                execute, next_agent, output_path,
+                                {**previous_outputs, agent_name: current_output},
+                            )
+                            for next_agent in next_agents
+                        ]
+                        for branch in branches:
+                            branch.result()
+                else:
+                    # Single child: extend the context in place, no copy needed
+                    previous_outputs[agent_name] = current_output
+                    stack.append((next_agents[0], output_path, previous_outputs))
 
         # Start the agent execution flow for this input file
         logger.info(f"Starting flow from agent: {initial_agent}")
-        print (f"fiel_path: {file_path}")
-
-        # Noe file_path is the path to the file and includes name
+        # Note: file_path is the path to the file and includes name
         execute(initial_agent, file_path)
+
+    # Optional allow-list of input extensions from default_config.json (e.g.
+    # ["tal", "txt"]); when absent, any file with an extension is accepted
+    input_extensions = default_config.get("input_extensions")
+    allowed_extensions = {ext.lstrip(".").lower() for ext in input_extensions} if input_extensions else None
+
+    # Collect the input files in the repository folder (excluding __init__.py).
+    # os.scandir yields DirEntry objects with cached stat info and cheap
+    # string checks on the name, avoiding the fnmatch pass Path.glob("*.*")
+    # runs on every entry.
+    files = []
+    with os.scandir(repo_folder) as it:
+        for entry in it:
+            if not entry.is_file() or entry.name == "__init__.py" or "." not in entry.name:
+                continue
+            if allowed_extensions is not None and entry.name.rpartition(".")[2].lower() not in allowed_extensions:
+                continue
+            files.append(Path(entry.path))
+
+    # Sort by name: directory-order iteration is effectively random, while a
+    # sorted snapshot gives deterministic processing order and better
+    # readahead locality for related files
+    files.sort(key=lambda p: p.name)
+
+    if not files:
+        logger.info("No input files found in repository folder")
+        return
+
+    # Per-file flows are independent and dominated by LLM HTTP calls, so a
+    # thread pool gives near-linear scaling with file count. Agents keep no
+    # per-file state and the OpenAI client is thread-safe, so the shared
+    # agents dict needs no locking. The pool size can be tuned with the
+    # optional "max_file_workers" key in default_config.json.
+    max_workers = min(default_config.get("max_file_workers", 32), len(files))
+    logger.info(f"Processing {len(files)} input file(s) with {max_workers} worker(s)")
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        list(executor.map(process_file, files))
@@ -0,0 +1,80 @@
+import functools
+import json
+import os
+import pickle
+import tempfile
+from pathlib import Path
+
+# Use orjson (SIMD-accelerated C parser, ~5x faster than stdlib json) when it
+# is installed; fall back to stdlib json otherwise. orjson.JSONDecodeError is
+# a subclass of json.JSONDecodeError, so callers' error handling is unchanged.
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+# On-disk cache of parsed configs, keyed by (path, mtime_ns, size) so any
+# change to a config file invalidates its entry. Skips JSON parsing entirely
+# on repeat startups when the configs are unchanged.
+_CONFIG_CACHE_FILE = Path.home() / ".cache" / "agent_workflow" / "configs.pkl"
+
+
+def load_json_config(config_path):
+    """
+    Load and parse a JSON config file, serving repeat loads of unchanged
+    files from an in-memory lru_cache backed by an on-disk pickle cache.
+    Module-level functions (rather than a singleton loader class) keep the
+    caching explicit and shared across all callers in the process.
+    """
+    config_path = Path(config_path)
+    # The stat result keys both cache layers, so editing a config file
+    # invalidates its entries automatically
+    st = config_path.stat()
+    return _load_json_config_cached(str(config_path), st.st_mtime_ns, st.st_size)
+
+
+@functools.lru_cache(maxsize=32)
+def _load_json_config_cached(path_str, mtime_ns, size):
+    config_path = Path(path_str)
+    key = (path_str, mtime_ns, size)
+
+    # Serve from the pickle cache when the file is unchanged; unpickling is
+    # cheaper than re-parsing JSON. The cache is best-effort: any failure
+    # here falls through to a normal parse. pickle.load on corrupt data can
+    # raise well beyond PickleError (AttributeError, ImportError, ...), so
+    # every failure is treated as a cache miss.
+    cache = {}
+    try:
+        with open(_CONFIG_CACHE_FILE, "rb") as f:
+            cache = pickle.load(f)
+        if key in cache:
+            return cache[key]
+    except Exception:
+        cache = {}
+
+    # Parse the JSON config file with the fastest available parser.
+    # read_bytes() pulls the whole file in a single large read() instead of
+    # the default 8 KB buffered chunks, and both parsers accept bytes directly.
+    data = config_path.read_bytes()
+    parsed = orjson.loads(data) if orjson is not None else json.loads(data)
+
+    # Refresh the cache, dropping any stale entries for this path. The new
+    # pickle is written to a unique temp file and swapped in with os.replace
+    # so concurrent loaders (threads or other processes) can never tear the
+    # cache file with interleaved writes.
+    try:
+        _CONFIG_CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
+        cache = {k: v for k, v in cache.items() if k[0] != key[0]}
+        cache[key] = parsed
+        fd, tmp_path = tempfile.mkstemp(dir=_CONFIG_CACHE_FILE.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                pickle.dump(cache, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, _CONFIG_CACHE_FILE)
+        except OSError:
+            os.unlink(tmp_path)
+            raise
+    except OSError:
+        pass
+    return parsed
@@ -0,0 +1,23 @@
+import threading
+from pathlib import Path
+
+# Directories already created in this process. The flow walk asks for the
+# same output folders over and over, so remembering them turns every repeat
+# request into a set lookup instead of an unconditional mkdir syscall.
+_created_dirs = set()
+_created_dirs_lock = threading.Lock()
+
+
+def ensure_dir(path):
+    """
+    Create the directory (and any missing parents) the first time it is
+    requested; later calls for the same path skip the syscall entirely.
+    Thread-safe, since flows and fan-out branches run concurrently.
+    """
+    path = Path(path)
+    if path in _created_dirs:
+        return path
+    path.mkdir(parents=True, exist_ok=True)
+    with _created_dirs_lock:
+        _created_dirs.add(path)
+    return path
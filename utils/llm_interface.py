@@ -1,9 +1,25 @@
+import functools
 import os
 from openai import OpenAI
 from utils.logger import get_logger
 
 logger = get_logger("LLM")
 
+
+@functools.lru_cache(maxsize=8)
+def _get_client(provider, base_url, api_key_env_var):
+    # One OpenAI client per (provider, base_url, key) for the whole process.
+    # The client wraps an httpx pool, so sharing it keeps TLS handshakes and
+    # keep-alive connections amortized across every agent; it is thread-safe,
+    # so concurrent flows can use it directly.
+    api_key = os.getenv(api_key_env_var)
+    if not api_key:
+        raise ValueError(f"{api_key_env_var} environment variable not set.")
+    if base_url:
+        return OpenAI(api_key=api_key, base_url=base_url)
+    return OpenAI(api_key=api_key)
+
+
 class LLMService:
     def __init__(self, agent_config):
         self.provider = agent_config.get("provider", "openai").lower()
@@ -20,26 +36,21 @@ class LLMService:
         self.user = agent_config.get("user", None)
 
         if self.provider == "openai":
-            api_key = os.getenv("OPENAI_API_KEY")
-            if not api_key:
-                raise ValueError("OPENAI_API_KEY environment variable not set.")
-            self.client = OpenAI(api_key=api_key)
+            self.client = _get_client("openai", None, "OPENAI_API_KEY")
         elif self.provider == "gemini":
-            gemini_key = os.getenv("GEMINI_API_NEOTEK_KEY")
-            if not gemini_key:
-                raise ValueError("GEMINI_API_NEOTEK_KEY environment variable not set.")
-            self.client = OpenAI(
-                api_key=gemini_key,
-                base_url="https://generativelanguage.googleapis.com/v1beta/openai/"
+            self.client = _get_client(
+                "gemini",
+                "https://generativelanguage.googleapis.com/v1beta/openai/",
+                "GEMINI_API_NEOTEK_KEY"
             )
         else:
             raise ValueError(f"Unsupported provider: {self.provider}")
-        print(f"Moderl Parameters: \n {agent_config}")
+        logger.debug("Model parameters: %s", agent_config)
 
-    def chat(self, messages):
+        # Pre-build the chat kwargs once: the provider-specific extras and the
+        # None-value filtering happen here instead of on every request
         kwargs = {
             "model": self.model,
-            "messages": messages,
             "temperature": self.temperature,
             "top_p": self.top_p,
             "n": self.n,
@@ -56,9 +67,14 @@ class LLMService:
             })
 
         # 🚫 Remove all keys with None values
-        kwargs = {k: v for k, v in kwargs.items() if v is not None}
+        self._base_kwargs = {k: v for k, v in kwargs.items() if v is not None}
+
+        # Bind the completions entry point once; chat then makes a single
+        # call with no per-request attribute-chain walk or provider branch
+        self._create_completion = self.client.chat.completions.create
 
-        response = self.client.chat.completions.create(**kwargs)
+    def chat(self, messages):
+        response = self._create_completion(messages=messages, **self._base_kwargs)
 
         usage = getattr(response, "usage", None)
         if usage: